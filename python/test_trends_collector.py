@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Tests for trends_collector.py.
+
+Feeds canned RSS and ")]}'"-prefixed explore API bodies through stubbed
+HTTP openers, so no network access is needed. Standard library only; run
+directly or via a unittest/pytest runner:
+
+    python3 python/test_trends_collector.py
+"""
+
+import io
+import json
+import sys
+import unittest
+import urllib.error
+import urllib.parse
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import trends_collector as tc  # noqa: E402
+
+RSS = b"""<?xml version="1.0" encoding="UTF-8"?>
+<rss xmlns:ht="https://trends.google.com/trending/rss" version="2.0">
+  <channel>
+    <title>Daily Search Trends</title>
+    <item>
+      <title>AI agents</title>
+      <ht:approx_traffic>2,000+</ht:approx_traffic>
+      <ht:news_item><ht:news_item_title>Agents news</ht:news_item_title></ht:news_item>
+    </item>
+    <item>
+      <title>Q&amp;A night</title>
+      <ht:approx_traffic>10K+</ht:approx_traffic>
+    </item>
+    <item>
+      <title>No traffic</title>
+    </item>
+    <item>
+      <title>Odd traffic</title>
+      <ht:approx_traffic>lots</ht:approx_traffic>
+    </item>
+    <item>
+      <title></title>
+      <ht:approx_traffic>500+</ht:approx_traffic>
+    </item>
+  </channel>
+</rss>
+"""
+
+EXPLORE = ")]}'\n" + json.dumps({
+    "widgets": [
+        {"id": "TIMESERIES", "request": {}, "token": "ts-token"},
+        {"id": "RELATED_QUERIES", "request": {"restriction": {"geo": {"country": "US"}}}, "token": "rq-token"},
+    ]
+})
+
+RELATED = ")]}',\n" + json.dumps({
+    "default": {
+        "rankedList": [
+            {"rankedKeyword": [
+                {"query": "ai agents framework", "value": 100},
+                {"query": "agentic ai", "value": 42},
+            ]},
+            {"rankedKeyword": [
+                {"query": "openai agents sdk", "value": 4500},
+                {"value": 300},
+                {"query": "agent builder"},
+            ]},
+        ]
+    }
+})
+
+
+class FakeOpener:
+    """Stands in for the cookie-aware opener; serves canned API bodies."""
+
+    def __init__(self, explore=EXPLORE, related=RELATED, error=None):
+        self.bodies = {tc.EXPLORE_API_URL: explore, tc.RELATED_API_URL: related}
+        self.error = error
+        self.requests = []
+
+    def open(self, request, timeout=None):
+        self.requests.append(request)
+        if self.error is not None:
+            raise self.error
+        base = request.full_url.split("?", 1)[0]
+        return io.BytesIO(self.bodies[base].encode("utf-8"))
+
+
+def fake_urlopen(body=RSS, seen=None):
+    def urlopen(request, timeout=None):
+        if seen is not None:
+            seen.append(request)
+        return io.BytesIO(body)
+    return urlopen
+
+
+def encoded_items(items):
+    """Round-trip items through the output encoder (dicts or msgspec Structs)."""
+    return tc._loads(tc._encode_output({"items": items}))["items"]
+
+
+class TrendsCollectorTest(unittest.TestCase):
+    def setUp(self):
+        self.opener = FakeOpener()
+        patches = [
+            mock.patch.object(tc, "_OPENER", self.opener),
+            mock.patch.object(tc.urllib.request, "urlopen", fake_urlopen()),
+            mock.patch.object(tc.time, "sleep", lambda seconds: None),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def test_parse_traffic(self):
+        self.assertEqual(tc._parse_traffic("2,000+"), 2000)
+        self.assertEqual(tc._parse_traffic("10K+"), 10000)
+        self.assertEqual(tc._parse_traffic("1.5M+"), 1500000)
+        self.assertEqual(tc._parse_traffic(" 200 "), 200)
+        with self.assertRaises(ValueError):
+            tc._parse_traffic("lots")
+
+    def test_trending_topics_from_rss(self):
+        seen = []
+        with mock.patch.object(tc.urllib.request, "urlopen", fake_urlopen(seen=seen)):
+            topics = tc._fetch_trending_topics("US")
+
+        self.assertEqual(topics, [
+            ("AI agents", 2000),
+            ("Q&A night", 10000),
+            ("No traffic", None),
+            ("Odd traffic", None),
+        ])
+        self.assertEqual(seen[0].full_url, "https://trends.google.com/trending/rss?geo=US")
+        self.assertEqual(seen[0].get_header("User-agent"), tc.REQUEST_HEADERS["User-Agent"])
+
+    def test_trending_topics_limit(self):
+        self.assertEqual(tc._fetch_trending_topics("US", limit=2),
+                         [("AI agents", 2000), ("Q&A night", 10000)])
+
+    def test_related_queries_map_top_and_rising(self):
+        related = tc._fetch_related_queries("AI agents", "US")
+
+        self.assertEqual(related["top"], [("ai agents framework", 100), ("agentic ai", 42)])
+        # The row without "query" is skipped, the one without "value" kept
+        self.assertEqual(related["rising"], [("openai agents sdk", 4500), ("agent builder", None)])
+
+        explore_request, related_request = self.opener.requests
+        self.assertEqual(explore_request.get_method(), "POST")
+        params = urllib.parse.parse_qs(urllib.parse.urlsplit(related_request.full_url).query)
+        self.assertEqual(params["token"], ["rq-token"])
+        self.assertEqual(json.loads(params["req"][0]), {"restriction": {"geo": {"country": "US"}}})
+
+    def test_fetch_trends_items(self):
+        items = encoded_items(tc.fetch_trends("AI agents", "US", 25))
+
+        self.assertEqual([item["title"] for item in items], [
+            "Trending: AI agents",
+            "Trending: Q&A night",
+            "Trending: No traffic",
+            "Trending: Odd traffic",
+            "Rising: openai agents sdk",
+            "Rising: agent builder",
+            "Top Related: ai agents framework",
+            "Top Related: agentic ai",
+        ])
+        self.assertEqual([item["engagement"]["impressions"] for item in items],
+                         [2000, 10000, 9000, 8500, 4500, 100, 100, 42])
+
+        first = items[0]
+        self.assertEqual(first["source"], "googletrends")
+        self.assertEqual(first["sourceUrl"], "https://trends.google.com/trends/explore?q=AI+agents&geo=US")
+        self.assertEqual(items[1]["sourceUrl"], "https://trends.google.com/trends/explore?q=Q%26A+night&geo=US")
+        self.assertEqual(first["citations"], [first["sourceUrl"]])
+        self.assertRegex(first["contentHash"], r"^[0-9a-f]{16}$")
+        self.assertRegex(first["retrievedAt"], r"^\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d\.\d{6}Z$")
+        self.assertEqual(len({item["retrievedAt"] for item in items}), 1)
+
+    def test_fetch_trends_caps_results(self):
+        self.assertEqual(len(tc.fetch_trends("AI agents", "US", 3)), 3)
+        self.assertEqual(len(tc.fetch_trends("AI agents", "US", 2_000_000_000)), 8)
+
+    def test_related_failure_keeps_trending_items(self):
+        self.opener.error = urllib.error.HTTPError(tc.EXPLORE_API_URL, 400, "Bad Request", {}, None)
+        items = encoded_items(tc.fetch_trends("AI agents", "US", 25))
+        self.assertEqual([item["title"] for item in items][-1], "Trending: Odd traffic")
+        self.assertEqual(len(items), 4)
+
+    def test_retries_throttled_requests(self):
+        attempts = []
+
+        def flaky_urlopen(request, timeout=None):
+            attempts.append(request)
+            if len(attempts) < 3:
+                raise urllib.error.HTTPError(request.full_url, 429, "Too Many Requests", {}, None)
+            return io.BytesIO(RSS)
+
+        with mock.patch.object(tc.urllib.request, "urlopen", flaky_urlopen):
+            topics = tc._fetch_trending_topics("US")
+        self.assertEqual(len(attempts), 3)
+        self.assertEqual(len(topics), 4)
+
+    def test_does_not_retry_client_errors(self):
+        self.opener.error = urllib.error.HTTPError(tc.EXPLORE_API_URL, 404, "Not Found", {}, None)
+        with self.assertRaises(urllib.error.HTTPError):
+            tc._fetch_related_queries("AI agents", "US")
+        self.assertEqual(len(self.opener.requests), 1)
+
+    def test_resolve_hasher(self):
+        self.assertIs(tc.resolve_hasher("sha256"), tc._sha256_hex16)
+        self.assertEqual(tc.resolve_hasher("sha256")(b"hello"), "2cf24dba5fb0a30e")
+        self.assertEqual(tc.resolve_hasher("blake2b")(b"hello"), "a7b6eda801e5347d")
+        with self.assertRaisesRegex(ValueError, "Unknown HASH_ALGO 'bogus'"):
+            tc.resolve_hasher("bogus")
+
+    def test_resolve_hasher_requires_optional_package(self):
+        with mock.patch.dict(tc._HASH_PACKAGES, {"xxh3": ("xxhash", None)}):
+            with self.assertRaisesRegex(ValueError, "requires the xxhash package"):
+                tc.resolve_hasher("xxh3")
+        with mock.patch.dict(tc._HASH_PACKAGES, {"blake3": ("blake3", None)}):
+            with self.assertRaisesRegex(ValueError, "requires the blake3 package"):
+                tc.resolve_hasher("blake3")
+
+    def test_handle_request_reports_hash_algo_error(self):
+        with mock.patch.object(tc, "HASH_ALGO_ERROR", "Unknown HASH_ALGO 'bogus'"):
+            result = tc.handle_request(b'{"query": "AI agents"}')
+        self.assertEqual(result, {"items": [], "error": "Unknown HASH_ALGO 'bogus'"})
+
+    def test_handle_request_reports_bad_input(self):
+        result = tc.handle_request(b"not json")
+        self.assertEqual(result["items"], [])
+        self.assertIn("error", result)
+
+
+if __name__ == "__main__":
+    unittest.main()
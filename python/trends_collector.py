@@ -1,142 +1,518 @@
 #!/usr/bin/env python3
 """
-Google Trends collector using PyTrends.
+Google Trends collector using the public Trends RSS feed and explore API.
 Reads JSON from stdin, outputs JSON to stdout.
 
+Works without external dependencies - uses only Python standard library.
+
 Usage:
     echo '{"query": "AI agents", "geo": "US", "maxResults": 10}' | python3 trends_collector.py
+
+Long-lived worker (one JSON request per stdin line, one JSON result per
+stdout line; the Trends session cookie is reused across requests):
+    python3 trends_collector.py --serve
 """
+import os
 import sys
 import json
 import hashlib
+import time
 import uuid
-from datetime import datetime, timezone
+from types import MappingProxyType
+import http.cookiejar
+import urllib.error
+import urllib.parse
+import urllib.request
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from itertools import chain, islice
+from typing import List, Optional
+
+# orjson is optional; fall back to the stdlib json module when missing.
+# _dumps returns UTF-8 bytes in both cases.
+try:
+    import orjson
+
+    _dumps = orjson.dumps
+    _loads = orjson.loads
+except ImportError:
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj).encode()
+
+    _loads = json.loads
 
+# msgspec is optional; when present, items are typed Structs encoded by
+# msgspec.json, otherwise plain dicts encoded by _dumps
 try:
-    from pytrends.request import TrendReq
+    import msgspec
 except ImportError:
-    print(json.dumps({
-        "items": [],
-        "error": "PyTrends not installed. Run: pip install pytrends"
-    }))
-    sys.exit(0)
+    msgspec = None
+
+if msgspec is not None:
+    class Engagement(msgspec.Struct):
+        """RawItem engagement metrics (trends only report impressions)."""
+        impressions: int = 0
+        likes: Optional[int] = None
+        shares: Optional[int] = None
+        comments: Optional[int] = None
+        views: Optional[int] = None
+
+    class RawItem(msgspec.Struct):
+        """RawItem record; field order matches the dict form."""
+        id: str
+        schemaVersion: str
+        source: str
+        sourceUrl: str
+        retrievedAt: str
+        content: str
+        contentHash: str
+        title: str
+        engagement: Engagement
+        citations: List[str]
+
+    _encode_output = msgspec.json.encode
+else:
+    _encode_output = _dumps
+
+
+def _sha256_hex16(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()[:16]
+
+
+def _blake2b_hex16(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=8).hexdigest()
+
+
+# xxhash is optional; HASH_ALGO=xxh3 is only usable when it is installed
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+
+def _xxh3_hex16(data: bytes) -> str:
+    return xxhash.xxh3_64_hexdigest(data)
+
+
+# blake3 is optional too; HASH_ALGO=blake3 needs the blake3 package
+try:
+    import blake3
+except ImportError:
+    blake3 = None
+
+
+def _blake3_hex16(data: bytes) -> str:
+    return blake3.blake3(data).hexdigest(8)
+
+
+# Content hash algorithm. Defaults to sha256 so existing item IDs stay
+# reproducible; set HASH_ALGO=xxh3, blake3 or blake2b to opt in to a faster
+# hash for new items. Each name always means exactly that algorithm: an
+# unknown name or a missing package is an error, never a silent substitute.
+CONTENT_HASHERS = {
+    "sha256": _sha256_hex16,
+    "xxh3": _xxh3_hex16,
+    "blake3": _blake3_hex16,
+    "blake2b": _blake2b_hex16,
+}
+# Algorithms backed by an optional package: name -> (package, module or None)
+_HASH_PACKAGES = {
+    "xxh3": ("xxhash", xxhash),
+    "blake3": ("blake3", blake3),
+}
+
+
+def resolve_hasher(name: str):
+    """Return the hasher for a HASH_ALGO name; raise ValueError if unusable."""
+    if name not in CONTENT_HASHERS:
+        raise ValueError(
+            f"Unknown HASH_ALGO '{name}' (expected one of: {', '.join(CONTENT_HASHERS)})"
+        )
+    package, module = _HASH_PACKAGES.get(name, (None, True))
+    if module is None:
+        raise ValueError(f"HASH_ALGO={name} requires the {package} package: pip install {package}")
+    return CONTENT_HASHERS[name]
+
+
+HASH_ALGO = (os.environ.get("HASH_ALGO") or "sha256").strip().lower()
+try:
+    _hash_content = resolve_hasher(HASH_ALGO)
+    HASH_ALGO_ERROR = None
+except ValueError as e:
+    _hash_content = None
+    HASH_ALGO_ERROR = str(e)  # Reported by handle_request instead of hashing
 
 SCHEMA_VERSION = "1.0.0"
 NAMESPACE_UUID = uuid.UUID("6ba7b810-9dad-11d1-80b4-00c04fd430c8")
 
+# Read-only engagement template; create_raw_item copies it per item
+ENGAGEMENT_TEMPLATE = MappingProxyType({
+    "impressions": 0,
+    "likes": None,
+    "shares": None,
+    "comments": None,
+    "views": None
+})
+
+TRENDS_BASE_URL = "https://trends.google.com"
+TRENDING_RSS_URL = TRENDS_BASE_URL + "/trending/rss?geo={geo}"
+EXPLORE_API_URL = TRENDS_BASE_URL + "/trends/api/explore"
+RELATED_API_URL = TRENDS_BASE_URL + "/trends/api/widgetdata/relatedsearches"
+_EXPLORE_URL_FMT = (TRENDS_BASE_URL + "/trends/explore?q={q}&geo={geo}").format
+REQUEST_TIMEOUT = 30  # seconds
+
+# Retry policy for Trends requests (same as the former TrendReq settings):
+# up to RETRIES retries on connection errors and these HTTP statuses, sleeping
+# BACKOFF_FACTOR * 2**attempt seconds between attempts
+RETRIES = 3
+BACKOFF_FACTOR = 1.0
+RETRY_STATUSES = frozenset({429, 500, 502, 504})
+
+# Per-source caps; together they bound how many items one fetch can return
+TRENDING_LIMIT = 10
+RISING_LIMIT = 10
+TOP_LIMIT = 5
+MAX_ITEMS = TRENDING_LIMIT + RISING_LIMIT + TOP_LIMIT
+HL = "en-US"
+TZ = "360"
+# Browser-like headers sent with every request (RSS feed and explore API)
+REQUEST_HEADERS = {"User-Agent": "Mozilla/5.0", "Accept-Language": HL}
+
+# Cookie-aware opener shared by every explore API call (see _get_opener)
+_OPENER = None
+
 
+@lru_cache(maxsize=256)
 def generate_id(url: str, content_hash: str) -> str:
     """Generate stable UUID v5 from URL and content hash."""
     return str(uuid.uuid5(NAMESPACE_UUID, f"{url}:{content_hash}"))
 
 
+@lru_cache(maxsize=256)
 def generate_content_hash(content: str) -> str:
-    """Generate SHA-256 hash of content."""
-    return hashlib.sha256(content.encode()).hexdigest()[:16]
+    """
+    Generate a 16-hex-char content hash using the HASH_ALGO algorithm.
 
+    Memoized: repeated content within a run is encoded and hashed once.
+    """
+    return _hash_content(content.encode())
 
-def create_raw_item(title: str, content: str, source_url: str, impressions: int = 0) -> dict:
-    """Create a RawItem-compatible dictionary."""
+
+def create_raw_item(title: str, content: str, source_url: str, retrieved_at: str,
+                    impressions: int = 0) -> "RawItem | dict":
+    """
+    Create a RawItem: a msgspec Struct when msgspec is installed, otherwise
+    a RawItem-compatible dictionary. Both encode to the same JSON.
+
+    retrieved_at is an ISO 8601 timestamp computed once per fetch and shared
+    by every item from that run.
+    """
     content_hash = generate_content_hash(content)
+    if msgspec is not None:
+        return RawItem(
+            id=generate_id(source_url, content_hash),
+            schemaVersion=SCHEMA_VERSION,
+            source="googletrends",
+            sourceUrl=source_url,
+            retrievedAt=retrieved_at,
+            content=content,
+            contentHash=content_hash,
+            title=title,
+            engagement=Engagement(impressions=impressions),
+            citations=[source_url]
+        )
     return {
         "id": generate_id(source_url, content_hash),
         "schemaVersion": SCHEMA_VERSION,
         "source": "googletrends",
         "sourceUrl": source_url,
-        "retrievedAt": datetime.now(timezone.utc).isoformat(),
+        "retrievedAt": retrieved_at,
         "content": content,
         "contentHash": content_hash,
         "title": title,
-        "engagement": {
-            "impressions": impressions,
-            "likes": None,
-            "shares": None,
-            "comments": None,
-            "views": None
-        },
+        "engagement": {**ENGAGEMENT_TEMPLATE, "impressions": impressions},
         "citations": [source_url]
     }
 
 
-def fetch_trends(query: str, geo: str, max_results: int) -> list:
-    """Fetch trends data using PyTrends."""
-    items = []
-    related = {}  # Initialize for use across try blocks
+def utc_now_iso() -> str:
+    """Return the current UTC time as an ISO 8601 string with a "Z" suffix."""
+    t = time.time()
+    return time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(t)) + f".{int(t % 1 * 1_000_000):06d}Z"
+
+
+def build_explore_url(topic: str, geo: str) -> str:
+    """Build the Trends explore URL for a topic, escaping it for the query string."""
+    return _EXPLORE_URL_FMT(q=urllib.parse.quote_plus(topic), geo=urllib.parse.quote_plus(geo))
+
+
+def _open_with_retry(open_fn, request):
+    """
+    Open request with open_fn (urlopen or an opener's open), retrying
+    transient failures per RETRIES / BACKOFF_FACTOR / RETRY_STATUSES.
+    """
+    for attempt in range(RETRIES + 1):
+        try:
+            return open_fn(request, timeout=REQUEST_TIMEOUT)
+        except urllib.error.HTTPError as e:
+            if e.code not in RETRY_STATUSES or attempt == RETRIES:
+                raise
+        except OSError:  # URLError, timeouts, connection resets
+            if attempt == RETRIES:
+                raise
+        time.sleep(BACKOFF_FACTOR * (2 ** attempt))
+
+
+def _get_opener() -> urllib.request.OpenerDirector:
+    """
+    Return the cookie-aware opener used for explore API calls.
+
+    Google rejects explore requests without an NID cookie, so the first call
+    visits the Trends homepage once and the opener is reused afterwards.
+    """
+    global _OPENER
+    if _OPENER is None:
+        opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar())
+        )
+        opener.addheaders = list(REQUEST_HEADERS.items())
+        _open_with_retry(opener.open, TRENDS_BASE_URL + "/").close()
+        _OPENER = opener
+    return _OPENER
 
-    pytrends = TrendReq(
-        hl='en-US',
-        tz=360,
-        retries=3,
-        backoff_factor=1.0,
-        timeout=(10, 30)
+
+def _read_api_json(url: str, params: dict, method: str = "GET") -> dict:
+    """Call a Trends API endpoint and decode its ")]}'"-prefixed JSON body."""
+    request = urllib.request.Request(
+        f"{url}?{urllib.parse.urlencode(params)}",
+        data=b"" if method == "POST" else None,
+        method=method,
     )
+    with _open_with_retry(_get_opener().open, request) as response:
+        body = response.read().decode("utf-8")
+    return _loads(body[body.index("{"):])
+
+
+def _parse_traffic(value: str) -> int:
+    """Parse an approx_traffic value such as "2,000+" or "10K+" into an int."""
+    value = value.strip().rstrip("+").replace(",", "").upper()
+    multiplier = 1
+    if value.endswith("K"):
+        multiplier, value = 1_000, value[:-1]
+    elif value.endswith("M"):
+        multiplier, value = 1_000_000, value[:-1]
+    return int(float(value) * multiplier)
+
+
+def _fetch_trending_topics(geo: str, limit: int = TRENDING_LIMIT) -> list:
+    """
+    Fetch daily trending searches from the Trends RSS feed.
+
+    Returns a list of (topic, approx_traffic) tuples; traffic is None when the
+    feed omits it or it cannot be parsed.
+    """
+    topics = []
+    request = urllib.request.Request(TRENDING_RSS_URL.format(geo=geo), headers=REQUEST_HEADERS)
+    with _open_with_retry(urllib.request.urlopen, request) as response:
+        for _, elem in ET.iterparse(response):
+            if elem.tag != "item":
+                continue
+
+            title = elem.findtext("title")
+            traffic = None
+            for child in elem:
+                if child.tag.endswith("}approx_traffic") and child.text:
+                    try:
+                        traffic = _parse_traffic(child.text)
+                    except ValueError:
+                        traffic = None
+                    break
+            elem.clear()
+
+            if title:
+                topics.append((title, traffic))
+                if len(topics) >= limit:
+                    break
+    return topics
+
+
+def _ranked_rows(ranked_list: list, index: int, limit: int) -> list:
+    """
+    Return up to limit (query, value) tuples from one rankedList entry.
+
+    Malformed rows (no "query") are skipped rather than raised, so one bad
+    row cannot discard the other list's results.
+    """
+    if len(ranked_list) <= index:
+        return []
+    rows = (
+        (keyword["query"], keyword.get("value"))
+        for keyword in ranked_list[index].get("rankedKeyword") or ()
+        if isinstance(keyword, dict) and keyword.get("query")
+    )
+    return list(islice(rows, limit))
+
 
-    # 1. Trending searches (daily hot topics)
+def _fetch_related_queries(query: str, geo: str) -> dict:
+    """
+    Fetch rising and top related queries for a keyword via the explore API.
+
+    Returns {"rising": [...], "top": [...]} where each entry is a
+    (query, value) tuple; value is None when the API omits it. Only the
+    first RISING_LIMIT rising and TOP_LIMIT top queries are kept.
+    """
+    explore = _read_api_json(EXPLORE_API_URL, {
+        "hl": HL,
+        "tz": TZ,
+        "req": json.dumps({
+            "comparisonItem": [{"keyword": query, "time": "now 7-d", "geo": geo}],
+            "category": 0,
+            "property": "",
+        }),
+    }, method="POST")
+
+    widget = next(w for w in explore["widgets"] if w["id"].startswith("RELATED_QUERIES"))
+    data = _read_api_json(RELATED_API_URL, {
+        "hl": HL,
+        "tz": TZ,
+        "req": json.dumps(widget["request"]),
+        "token": widget["token"],
+    })
+
+    ranked = data["default"]["rankedList"]
+    return {
+        "top": _ranked_rows(ranked, 0, TOP_LIMIT),
+        "rising": _ranked_rows(ranked, 1, RISING_LIMIT),
+    }
+
+
+def _fetch_trending(geo: str, retrieved_at: str) -> list:
+    """Build RawItems for daily trending searches (empty list on failure)."""
+    items = []
     try:
-        trending = pytrends.trending_searches(pn=geo.lower())
-        for idx, topic in enumerate(trending[0].tolist()[:10]):
-            url = f"https://trends.google.com/trends/explore?q={topic.replace(' ', '+')}&geo={geo}"
+        for idx, (topic, traffic) in enumerate(_fetch_trending_topics(geo)):
+            url = build_explore_url(topic, geo)
             items.append(create_raw_item(
                 title=f"Trending: {topic}",
                 content=f"'{topic}' is currently trending on Google in {geo}. This topic is gaining significant search interest.",
                 source_url=url,
-                impressions=10000 - (idx * 500)  # Relative ranking
+                retrieved_at=retrieved_at,
+                impressions=traffic if traffic is not None else 10000 - (idx * 500)  # Relative ranking
             ))
     except Exception:
-        pass  # Continue with other methods
+        pass  # Keep whatever was collected
+    return items
+
+
+def _fetch_related(query: str, geo: str, retrieved_at: str) -> list:
+    """Build RawItems for rising and top related queries (empty list on failure)."""
+    items = []
+    related = {}  # Initialize for use across try blocks
 
-    # 2. Related queries for the user's topic
+    # Rising related queries for the user's topic
     try:
-        pytrends.build_payload([query], geo=geo, timeframe='now 7-d')
-        related = pytrends.related_queries()
-
-        if query in related and related[query]['rising'] is not None:
-            rising = related[query]['rising']
-            for _, row in rising.head(10).iterrows():
-                related_query = row['query']
-                url = f"https://trends.google.com/trends/explore?q={related_query.replace(' ', '+')}&geo={geo}"
-                items.append(create_raw_item(
-                    title=f"Rising: {related_query}",
-                    content=f"'{related_query}' is a rising search related to '{query}'. Search interest is increasing rapidly.",
-                    source_url=url,
-                    impressions=int(row.get('value', 100))
-                ))
+        related = _fetch_related_queries(query, geo)
+
+        for related_query, value in related["rising"]:
+            url = build_explore_url(related_query, geo)
+            items.append(create_raw_item(
+                title=f"Rising: {related_query}",
+                content=f"'{related_query}' is a rising search related to '{query}'. Search interest is increasing rapidly.",
+                source_url=url,
+                retrieved_at=retrieved_at,
+                impressions=int(value if value is not None else 100)
+            ))
     except Exception:
         pass  # Continue
 
-    # 3. Top related queries
+    # Top related queries
     try:
-        if query in related and related[query]['top'] is not None:
-            top = related[query]['top']
-            for _, row in top.head(5).iterrows():
-                top_query = row['query']
-                url = f"https://trends.google.com/trends/explore?q={top_query.replace(' ', '+')}&geo={geo}"
-                items.append(create_raw_item(
-                    title=f"Top Related: {top_query}",
-                    content=f"'{top_query}' is a top search related to '{query}' with sustained high interest.",
-                    source_url=url,
-                    impressions=int(row.get('value', 50))
-                ))
+        for top_query, value in related.get("top", []):
+            url = build_explore_url(top_query, geo)
+            items.append(create_raw_item(
+                title=f"Top Related: {top_query}",
+                content=f"'{top_query}' is a top search related to '{query}' with sustained high interest.",
+                source_url=url,
+                retrieved_at=retrieved_at,
+                impressions=int(value if value is not None else 50)
+            ))
     except Exception:
         pass
 
-    return items[:max_results]
+    return items
 
 
-def main():
+def fetch_trends(query: str, geo: str, max_results: int) -> list:
+    """
+    Fetch trends data from the Google Trends RSS feed and explore API.
+
+    Trending searches and related queries are independent network calls, so
+    they run concurrently; each returns partial results on its own failure.
+    """
+    # Preallocated to the smaller of max_results and what a fetch can yield,
+    # so a large (caller-supplied) maxResults never drives the allocation
+    items = [None] * max(min(max_results, MAX_ITEMS), 0)
+    count = 0
+    retrieved_at = utc_now_iso()
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        trending_future = executor.submit(_fetch_trending, geo, retrieved_at)
+        related_future = executor.submit(_fetch_related, query, geo, retrieved_at)
+
+        # Trending first, then related, matching the sequential ordering
+        for item in chain(trending_future.result(), related_future.result()):
+            if count >= len(items):
+                break
+            items[count] = item
+            count += 1
+
+    if count < len(items):
+        del items[count:]
+    return items
+
+
+def _write_json(obj) -> None:
+    """Write obj to stdout as a single JSON line in one buffered write."""
+    sys.stdout.buffer.write(_encode_output(obj) + b"\n")
+    sys.stdout.buffer.flush()
+
+
+def handle_request(raw: bytes) -> dict:
+    """Run one collector request given its raw JSON body; errors are returned, not raised."""
+    if HASH_ALGO_ERROR is not None:
+        return {"items": [], "error": HASH_ALGO_ERROR}
+
     try:
-        # Read JSON from stdin
-        input_data = json.loads(sys.stdin.read())
+        input_data = _loads(raw)
         query = input_data.get('query', '')
         geo = input_data.get('geo', 'US')
         max_results = input_data.get('maxResults', 25)
 
-        items = fetch_trends(query, geo, max_results)
-
-        print(json.dumps({"items": items}))
+        return {"items": fetch_trends(query, geo, max_results)}
 
     except Exception as e:
-        print(json.dumps({"items": [], "error": str(e)}))
+        return {"items": [], "error": str(e)}
+
+
+def serve() -> None:
+    """Answer NDJSON requests from stdin until EOF, one result line per request."""
+    while True:
+        line = sys.stdin.buffer.readline()
+        if not line:
+            break
+        if not line.strip():
+            continue
+        _write_json(handle_request(line))
+
+
+def main():
+    if "--serve" in sys.argv[1:]:
+        serve()
+        return
+
+    # Read JSON from stdin
+    _write_json(handle_request(sys.stdin.buffer.read()))
 
 
 if __name__ == "__main__":
@@ -6,29 +6,134 @@ This script removes EXIF, IPTC, and other metadata from images while
 preserving the visual content. Useful for removing AI generator signatures.
 
 Works without external dependencies - uses only Python standard library.
+The segment walkers run per JPEG segment / PNG chunk (not per byte) and hand
+bulk copies to the OS (mmap writes, sendfile, bounded reads), so there is no
+compiled (C/Cython/Numba) fast path to build or install.
 """
 
+import mmap
+import os
+import stat
 import struct
 import sys
+import tempfile
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import BinaryIO, List, Optional, Tuple
+
+# JPEG markers kept when stripping: SOF0-3, DHT, DQT, DRI, SOS.
+# APP0 (JFIF) is not needed to decode and can carry a thumbnail extension,
+# so it is only kept on request.
+_JPEG_ESSENTIAL = frozenset({0xc0, 0xc1, 0xc2, 0xc3, 0xc4, 0xdb, 0xdd, 0xda})
+_JPEG_ESSENTIAL_WITH_JFIF = _JPEG_ESSENTIAL | {0xe0}
+
+# PNG chunks kept when stripping; tEXt, zTXt, iTXt, tIME, etc. are dropped.
+# Stored as big-endian uint32 tags so a chunk header never needs slicing.
+_PNG_ESSENTIAL = frozenset(int.from_bytes(tag, 'big') for tag in (
+    b'IHDR', b'IDAT', b'PLTE', b'tRNS', b'IEND',
+    b'pHYs', b'gAMA', b'cHRM', b'sRGB'
+))
+_PNG_IEND = int.from_bytes(b'IEND', 'big')
+
+# Prebuilt big-endian readers (avoid re-parsing the format per call)
+_UNPACK_U16 = struct.Struct('>H').unpack_from
+_UNPACK_PNG_CHUNK_HEADER = struct.Struct('>II').unpack_from  # (length, tag)
+
+# Buffer size for streamed chunk copies
+_COPY_BUFSIZE = 64 * 1024
+
+
+def _copy_bytes(src, dst, count: int) -> int:
+    """Copy up to count bytes from src to dst in bounded reads; return bytes copied."""
+    copied = 0
+    while copied < count:
+        buf = src.read(min(count - copied, _COPY_BUFSIZE))
+        if not buf:
+            break
+        dst.write(buf)
+        copied += len(buf)
+    return copied
+
 
+def _copy_file_range(src, dst, offset: int, count: int) -> int:
+    """
+    Copy count bytes starting at offset from src to dst; return bytes copied.
 
-def strip_jpeg_metadata(input_path: Path, output_path: Path) -> Tuple[int, int]:
+    Uses os.sendfile so the kernel moves the data without a userspace copy,
+    falling back to bounded reads where sendfile is unavailable or refuses
+    the file types (e.g. non-Linux platforms).
     """
-    Strip metadata from JPEG files by removing APP1-APP15 and COM segments.
-    Keeps only essential markers: SOF, DHT, DQT, DRI, SOS, APP0 (JFIF).
+    dst.flush()
+    copied = 0
+    try:
+        while copied < count:
+            sent = os.sendfile(dst.fileno(), src.fileno(), offset + copied, count - copied)
+            if sent == 0:
+                return copied
+            copied += sent
+        return copied
+    except (AttributeError, OSError):
+        src.seek(offset + copied)
+        return copied + _copy_bytes(src, dst, count - copied)
+
+
+@contextmanager
+def _open_output(src: BinaryIO, output_path: Path):
     """
-    with open(input_path, 'rb') as f:
-        data = f.read()
+    Open output_path for binary writing, safely even when it is src itself.
 
-    if not data.startswith(b'\xff\xd8'):
-        raise ValueError('Not a valid JPEG file')
+    The strippers read from src while writing, so truncating the input would
+    destroy it. For in-place runs the output goes to a temp file in the same
+    directory, which replaces the input only once it is fully written.
+    """
+    src_stat = os.fstat(src.fileno())
+    try:
+        in_place = os.path.samestat(src_stat, os.stat(output_path))
+    except FileNotFoundError:
+        in_place = False
+
+    if not in_place:
+        with open(output_path, 'wb') as fout:
+            yield fout
+        return
+
+    fd, tmp_path = tempfile.mkstemp(
+        dir=os.path.dirname(os.path.abspath(output_path)),
+        prefix=f'.{Path(output_path).name}.', suffix='.tmp'
+    )
+    try:
+        with os.fdopen(fd, 'wb') as fout:
+            yield fout
+        os.chmod(tmp_path, stat.S_IMODE(src_stat.st_mode))
+        os.replace(tmp_path, output_path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def _jpeg_plan(data, essential: frozenset) -> Tuple[List[Tuple[int, int]], int]:
+    """
+    Walk JPEG segments and plan which byte ranges of data to keep.
 
-    output = bytearray(b'\xff\xd8')  # SOI (Start of Image) marker
+    Returns (ranges, tail_start): ranges is a list of (start, end) offsets
+    for SOI and each kept marker/segment, with adjacent ranges merged;
+    tail_start is where the post-SOS data begins (len(data) if there is none).
+    The walk only indexes data, so it does no copying of its own.
+    """
+    size = len(data)
+    ranges = [(0, 2)]  # SOI (Start of Image) marker
+
+    def keep(start: int, end: int) -> None:
+        if ranges[-1][1] == start:
+            ranges[-1] = (ranges[-1][0], end)
+        else:
+            ranges.append((start, end))
 
     pos = 2
-    while pos < len(data):
+    while pos < size:
         if data[pos] != 0xff:
             break
 
@@ -37,94 +142,114 @@ def strip_jpeg_metadata(input_path: Path, output_path: Path) -> Tuple[int, int]:
 
         # End of image
         if marker == 0xd9:
-            output.extend(b'\xff\xd9')
+            keep(pos - 2, pos)
             break
 
         # Markers without length
         if marker == 0x01 or (0xd0 <= marker <= 0xd7):
-            output.extend(bytes([0xff, marker]))
+            keep(pos - 2, pos)
             continue
 
         # Read segment length
-        if pos + 2 > len(data):
+        if pos + 2 > size:
             break
-        length = struct.unpack('>H', data[pos:pos + 2])[0]
+        length = _UNPACK_U16(data, pos)[0]
 
-        # Keep essential markers, skip metadata (APP1-APP15, COM)
-        # Essential: SOF, DHT, DQT, DRI, SOS, APP0 (JFIF)
-        essential_markers = [0xc0, 0xc1, 0xc2, 0xc3, 0xc4, 0xdb, 0xdd, 0xda, 0xe0]
-
-        if marker in essential_markers:
-            # Copy marker and segment
-            output.extend(b'\xff' + bytes([marker]))
-            output.extend(data[pos:pos + length])
+        # Keep essential markers, skip metadata (APPn, COM)
+        if marker in essential:
+            # Marker and segment are contiguous in the input
+            keep(pos - 2, min(pos + length, size))
 
         pos += length
 
-        # After SOS (Start of Scan), copy all remaining image data
+        # After SOS (Start of Scan), all remaining data is image data
         if marker == 0xda:
-            output.extend(data[pos:])
-            break
+            return ranges, min(pos, size)
+
+    return ranges, size
+
+
+def strip_jpeg_metadata(f: BinaryIO, output_path: Path,
+                        keep_jfif: bool = False) -> Tuple[int, int]:
+    """
+    Strip metadata from JPEG files by removing APP0-APP15 and COM segments.
+    Keeps only essential markers: SOF, DHT, DQT, DRI, SOS, plus APP0 (JFIF)
+    when keep_jfif is True.
+
+    f is an already-open binary file (any position). It is memory-mapped and
+    planned by _jpeg_plan; kept ranges are written straight from the mapping,
+    and the entropy-coded data after SOS, most of the file, is copied from
+    the input file to the output file.
+    """
+    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, \
+            memoryview(mm) as data:
+        size = len(data)
+
+        if data[:2] != b'\xff\xd8':
+            raise ValueError('Not a valid JPEG file')
+
+        essential = _JPEG_ESSENTIAL_WITH_JFIF if keep_jfif else _JPEG_ESSENTIAL
+        ranges, tail_start = _jpeg_plan(data, essential)
 
-    with open(output_path, 'wb') as f:
-        f.write(output)
+        cleaned_size = 0
+        with _open_output(f, output_path) as fout:
+            for start, end in ranges:
+                fout.write(data[start:end])
+                cleaned_size += end - start
+            if tail_start < size:
+                cleaned_size += _copy_file_range(f, fout, tail_start, size - tail_start)
 
-    return len(data), len(output)
+    return size, cleaned_size
 
 
-def strip_png_metadata(input_path: Path, output_path: Path) -> Tuple[int, int]:
+def strip_png_metadata(fin: BinaryIO, output_path: Path) -> Tuple[int, int]:
     """
     Strip metadata from PNG files by removing non-essential chunks.
     Keeps only: IHDR, IDAT, PLTE, tRNS, IEND, and basic color chunks.
-    """
-    with open(input_path, 'rb') as f:
-        data = f.read()
 
+    Chunks are streamed: each 8-byte header is read, essential chunks are
+    copied to the output in bounded reads and the rest are seeked past, so
+    memory use stays at one copy buffer regardless of image size.
+
+    fin is an already-open binary file; it is read from the start.
+    """
     png_sig = b'\x89PNG\r\n\x1a\n'
 
-    if not data.startswith(png_sig):
+    # Rewinding after detect_image_type stays within the read buffer
+    fin.seek(0)
+    if fin.read(8) != png_sig:
         raise ValueError('Not a valid PNG file')
 
-    output = bytearray(png_sig)
+    original_size = os.fstat(fin.fileno()).st_size
 
-    pos = 8
-    while pos < len(data):
-        if pos + 8 > len(data):
-            break
+    with _open_output(fin, output_path) as fout:
+        fout.write(png_sig)
+        cleaned_size = 8
 
-        length = struct.unpack('>I', data[pos:pos + 4])[0]
-        chunk_type = data[pos + 4:pos + 8]
+        while True:
+            header = fin.read(8)
+            if len(header) < 8:
+                break
 
-        # Keep only essential chunks
-        # Remove metadata chunks like tEXt, zTXt, iTXt, tIME, etc.
-        essential = chunk_type in [
-            b'IHDR', b'IDAT', b'PLTE', b'tRNS', b'IEND',
-            b'pHYs', b'gAMA', b'cHRM', b'sRGB'
-        ]
+            length, tag = _UNPACK_PNG_CHUNK_HEADER(header)
 
-        if essential:
-            # Copy entire chunk (length + type + data + CRC)
-            chunk_end = pos + 12 + length
-            output.extend(data[pos:chunk_end])
+            # Keep only essential chunks
+            if tag in _PNG_ESSENTIAL:
+                # Copy entire chunk (length + type + data + CRC)
+                fout.write(header)
+                cleaned_size += 8 + _copy_bytes(fin, fout, length + 4)
+            else:
+                fin.seek(length + 4, os.SEEK_CUR)
 
-        # Move to next chunk
-        pos += 12 + length
-
-        # Stop after IEND
-        if chunk_type == b'IEND':
-            break
-
-    with open(output_path, 'wb') as f:
-        f.write(output)
-
-    return len(data), len(output)
+            # Stop after IEND
+            if tag == _PNG_IEND:
+                break
 
+    return original_size, cleaned_size
 
-def detect_image_type(file_path: Path) -> str:
-    """Detect if file is JPEG or PNG by reading magic bytes."""
-    with open(file_path, 'rb') as f:
-        header = f.read(8)
 
+def detect_image_type(header: bytes) -> str:
+    """Detect if a file is JPEG or PNG from its first 8 (magic) bytes."""
     if header.startswith(b'\xff\xd8'):
         return 'jpeg'
     elif header.startswith(b'\x89PNG\r\n\x1a\n'):
@@ -133,43 +258,52 @@ def detect_image_type(file_path: Path) -> str:
         raise ValueError(f'Unsupported file format (only JPEG and PNG supported)')
 
 
-def strip_metadata(input_path: str, output_path: Optional[str] = None) -> None:
+def strip_metadata(input_path: str, output_path: Optional[str] = None,
+                   keep_jfif: bool = False) -> None:
     """
     Remove all metadata from an image file.
 
     Args:
         input_path: Path to the input image
         output_path: Path for the output image (if None, adds "_clean" suffix)
+        keep_jfif: Keep the JPEG APP0 (JFIF) segment (ignored for PNG)
     """
     input_file = Path(input_path)
 
-    if not input_file.exists():
-        raise FileNotFoundError(f"Image not found: {input_path}")
-
     # Default output path: add "_clean" suffix
     if output_path is None:
         output_file = input_file.parent / f"{input_file.stem}_clean{input_file.suffix}"
     else:
         output_file = Path(output_path)
 
-    # Detect and process image type
-    img_type = detect_image_type(input_file)
+    # Open the input once: detection and stripping share the handle
+    try:
+        fin = open(input_file, 'rb')
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Image not found: {input_path}") from None
+
+    with fin:
+        # Detect and process image type
+        img_type = detect_image_type(fin.read(8))
 
-    if img_type == 'jpeg':
-        original_size, cleaned_size = strip_jpeg_metadata(input_file, output_file)
-    elif img_type == 'png':
-        original_size, cleaned_size = strip_png_metadata(input_file, output_file)
+        if img_type == 'jpeg':
+            original_size, cleaned_size = strip_jpeg_metadata(fin, output_file, keep_jfif)
+        elif img_type == 'png':
+            original_size, cleaned_size = strip_png_metadata(fin, output_file)
 
     saved_bytes = original_size - cleaned_size
     saved_percent = 100 * saved_bytes / original_size if original_size > 0 else 0
 
-    print(f"✓ Metadata stripped successfully")
-    print(f"  Input:  {input_file}")
-    print(f"  Output: {output_file}")
-    print(f"  Type:   {img_type.upper()}")
-    print(f"  Original: {original_size:,} bytes")
-    print(f"  Cleaned:  {cleaned_size:,} bytes")
-    print(f"  Saved:    {saved_bytes:,} bytes ({saved_percent:.1f}%)")
+    lines = [
+        "✓ Metadata stripped successfully",
+        f"  Input:  {input_file}",
+        f"  Output: {output_file}",
+        f"  Type:   {img_type.upper()}",
+        f"  Original: {original_size:,} bytes",
+        f"  Cleaned:  {cleaned_size:,} bytes",
+        f"  Saved:    {saved_bytes:,} bytes ({saved_percent:.1f}%)",
+    ]
+    sys.stdout.write("\n".join(lines) + "\n")
 
 
 def main():
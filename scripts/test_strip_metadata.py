@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Regression checks for strip_metadata.py.
+
+Builds small synthetic JPEG and PNG files and verifies what survives
+stripping. Standard library only; run directly or via a unittest/pytest
+runner:
+
+    python3 scripts/test_strip_metadata.py
+"""
+
+import io
+import struct
+import sys
+import tempfile
+import unittest
+import zlib
+from contextlib import redirect_stdout
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from strip_metadata import strip_metadata  # noqa: E402
+
+
+def jpeg_segment(marker: int, payload: bytes) -> bytes:
+    return bytes([0xff, marker]) + struct.pack('>H', len(payload) + 2) + payload
+
+
+def png_chunk(chunk_type: bytes, data: bytes) -> bytes:
+    crc = zlib.crc32(chunk_type + data)
+    return struct.pack('>I', len(data)) + chunk_type + data + struct.pack('>I', crc)
+
+
+SOI = b'\xff\xd8'
+EOI = b'\xff\xd9'
+APP0 = jpeg_segment(0xe0, b'JFIF\x00\x01\x01\x00\x00\x01\x00\x01\x00\x00')
+APP1 = jpeg_segment(0xe1, b'Exif\x00\x00' + b'\x11' * 4000)
+COM = jpeg_segment(0xfe, b'generated by an image model')
+DQT = jpeg_segment(0xdb, bytes(range(65)))
+SOF0 = jpeg_segment(0xc0, bytes(range(15)))
+DHT = jpeg_segment(0xc4, bytes(range(30)))
+SOS = jpeg_segment(0xda, bytes(range(10)))
+SCAN = bytes(i % 255 for i in range(150_000))  # never 0xff, like stuffed data
+
+JPEG = SOI + APP0 + APP1 + COM + DQT + SOF0 + DHT + SOS + SCAN + EOI
+JPEG_STRIPPED = SOI + DQT + SOF0 + DHT + SOS + SCAN + EOI
+JPEG_STRIPPED_KEEP_JFIF = SOI + APP0 + DQT + SOF0 + DHT + SOS + SCAN + EOI
+
+PNG_SIG = b'\x89PNG\r\n\x1a\n'
+IHDR = png_chunk(b'IHDR', struct.pack('>IIBBBBB', 64, 64, 8, 2, 0, 0, 0))
+GAMA = png_chunk(b'gAMA', struct.pack('>I', 45455))
+TEXT = png_chunk(b'tEXt', b'Software\x00image model' * 50)
+IDAT1 = png_chunk(b'IDAT', bytes(i % 256 for i in range(120_000)))
+ITXT = png_chunk(b'iTXt', b'parameters\x00\x00\x00\x00\x00' + b'x' * 900)
+IDAT2 = png_chunk(b'IDAT', bytes(i % 253 for i in range(70_000)))
+IEND = png_chunk(b'IEND', b'')
+
+PNG = PNG_SIG + IHDR + TEXT + GAMA + IDAT1 + ITXT + IDAT2 + IEND
+PNG_STRIPPED = PNG_SIG + IHDR + GAMA + IDAT1 + IDAT2 + IEND
+
+
+class StripMetadataTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp = Path(self._tmp.name)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def strip(self, name: str, data: bytes, in_place: bool = False, **kwargs) -> bytes:
+        input_path = self.tmp / name
+        input_path.write_bytes(data)
+        output_path = input_path if in_place else self.tmp / f'out_{name}'
+        with redirect_stdout(io.StringIO()):
+            strip_metadata(str(input_path), str(output_path), **kwargs)
+        return output_path.read_bytes()
+
+    def test_jpeg_keep_jfif_matches_original_behaviour(self):
+        self.assertEqual(self.strip('a.jpg', JPEG, keep_jfif=True), JPEG_STRIPPED_KEEP_JFIF)
+
+    def test_jpeg_drops_app0_by_default(self):
+        self.assertEqual(self.strip('a.jpg', JPEG), JPEG_STRIPPED)
+
+    def test_png_keeps_only_essential_chunks(self):
+        self.assertEqual(self.strip('a.png', PNG), PNG_STRIPPED)
+
+    def test_jpeg_in_place(self):
+        self.assertEqual(self.strip('a.jpg', JPEG, in_place=True), JPEG_STRIPPED)
+        self.assertEqual(sorted(p.name for p in self.tmp.iterdir()), ['a.jpg'])
+
+    def test_png_in_place(self):
+        self.assertEqual(self.strip('a.png', PNG, in_place=True), PNG_STRIPPED)
+        self.assertEqual(sorted(p.name for p in self.tmp.iterdir()), ['a.png'])
+
+    def test_truncated_jpeg_keeps_partial_scan(self):
+        truncated = JPEG[:-50_000]
+        self.assertEqual(self.strip('t.jpg', truncated), JPEG_STRIPPED[:-50_000])
+
+    def test_truncated_png_stops_at_eof(self):
+        truncated = PNG[:len(PNG_SIG + IHDR + TEXT + GAMA) + 1000]
+        expected = PNG_SIG + IHDR + GAMA + IDAT1[:1000]
+        self.assertEqual(self.strip('t.png', truncated), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
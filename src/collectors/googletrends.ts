@@ -1,13 +1,14 @@
 /**
- * Google Trends Collector - PyTrends Subprocess
+ * Google Trends Collector - Python Subprocess
  *
  * OPTIONAL data source with WARNING mechanism. Non-fatal on failure.
- * Spawns a Python subprocess that uses PyTrends to collect trend data.
+ * Spawns a Python subprocess that reads the Google Trends RSS feed and
+ * explore API to collect trend data.
  *
  * Collects: daily trends, related queries, top queries.
  *
  * Prerequisites:
- *   pip install pytrends
+ *   python3 (standard library only)
  */
 
 import { spawn } from 'child_process';
@@ -65,7 +66,7 @@ async function callPythonScript(request: PyTrendsRequest): Promise<PyTrendsRespo
     // Timeout handler
     const timeout = setTimeout(() => {
       python.kill('SIGTERM');
-      resolve({ items: [], error: 'PyTrends timeout after 60s' });
+      resolve({ items: [], error: 'Google Trends collector timeout after 60s' });
     }, TIMEOUT_MS);
 
     python.stdout.on('data', (data: Buffer) => {
@@ -80,7 +81,7 @@ async function callPythonScript(request: PyTrendsRequest): Promise<PyTrendsRespo
       clearTimeout(timeout);
 
       if (code !== 0) {
-        logVerbose(`PyTrends stderr: ${stderr}`);
+        logVerbose(`GoogleTrends stderr: ${stderr}`);
         resolve({
           items: [],
           error: `Process exited with code ${code}${stderr ? ': ' + stderr.slice(0, 200) : ''}`,
@@ -92,14 +93,14 @@ async function callPythonScript(request: PyTrendsRequest): Promise<PyTrendsRespo
         const response = JSON.parse(stdout) as PyTrendsResponse;
         resolve(response);
       } catch {
-        logVerbose(`PyTrends invalid JSON output: ${stdout.slice(0, 200)}`);
+        logVerbose(`GoogleTrends invalid JSON output: ${stdout.slice(0, 200)}`);
         resolve({ items: [], error: 'Invalid JSON response from Python script' });
       }
     });
 
     python.on('error', (err: Error) => {
       clearTimeout(timeout);
-      logVerbose(`PyTrends spawn error: ${err.message}`);
+      logVerbose(`GoogleTrends spawn error: ${err.message}`);
 
       if (err.message.includes('ENOENT')) {
         resolve({
@@ -122,7 +123,7 @@ async function callPythonScript(request: PyTrendsRequest): Promise<PyTrendsRespo
 // ============================================
 
 /**
- * Collect data from Google Trends using PyTrends subprocess.
+ * Collect data from Google Trends using the Python collector subprocess.
  *
  * OPTIONAL data source with WARNING mechanism. Non-fatal on failure.
  * If collection fails, logs a warning and returns empty array.
@@ -146,7 +147,7 @@ export async function searchGoogleTrends(
     return [];
   }
 
-  logInfo(`GoogleTrends: Fetching trends for "${query}" via PyTrends subprocess`);
+  logInfo(`GoogleTrends: Fetching trends for "${query}" via Python subprocess`);
 
   const response = await callPythonScript({
     query,